@@ -1,4 +1,6 @@
+from .kernels import set_backend, get_backend
 from .trendscanning import *
 from .montecarlo import MonteCarlo
 from .indicators import *
 from .helpers import *
+from .pipeline import Pipeline, PipelineError
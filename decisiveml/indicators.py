@@ -7,66 +7,181 @@ from decisiveml.helpers import tradingday_offset
 logger = logging.getLogger(__name__)
 
 
-def indicator_volatility_daily(df_daily, price_col="close"):
+def _values(df, col):
+    """Returns df[col] as a float array in its own dtype, a view of the frame when
+    possible.  Only non-float columns are converted to float64"""
+    values = df[col].to_numpy(copy=False)
+    if values.dtype.kind != "f":
+        values = values.astype(np.float64)
+    return values
+
+
+def _check_out(out, copy):
+    if out is not None and copy:
+        raise ValueError("out buffers are only written when copy=False")
+
+
+def _buffers(columns, n, dtype, out):
+    """Returns a result array per column, taken from out or preallocated as dtype
+
+    Buffers always have the length of the input frame, n.  Indicators that drop
+    nan rows write the kept rows at their input positions and return only those
+    rows, see _valid_rows
+    """
+    unknown = set(out or ()) - set(columns)
+    if unknown:
+        raise ValueError(
+            "Unknown out buffers {}, expected {}".format(sorted(unknown), columns)
+        )
+    buffers = {}
+    for col in columns:
+        if out is not None and col in out:
+            buffers[col] = out[col]
+            if buffers[col].dtype.kind != "f":
+                raise ValueError(
+                    "Buffer {} has dtype {}, expected a float dtype".format(
+                        col, buffers[col].dtype
+                    )
+                )
+            if buffers[col].shape != (n,):
+                raise ValueError(
+                    "Buffer {} has shape {}, expected {}".format(
+                        col, buffers[col].shape, (n,)
+                    )
+                )
+        else:
+            buffers[col] = np.empty(n, dtype=dtype or np.float64)
+    return buffers
+
+
+def _valid_rows(m_valid):
+    """Returns the rows to keep as a slice when they are one trailing block, so
+    the result views the buffers, otherwise the mask itself"""
+    first = int(m_valid.argmax()) if m_valid.any() else m_valid.shape[0]
+    if m_valid[first:].all():
+        return slice(first, None)
+    return m_valid
+
+
+def _rolling(values, lookback):
+    return pd.Series(values, copy=False).rolling(lookback)
+
+
+def _astype(df, dtype):
+    return df if dtype is None else df.astype(dtype)
+
+
+def indicator_volatility_daily(
+    df_daily, price_col="close", dtype=None, copy=True, out=None
+):
     """Create rolling volatility using EWM of 36 which matches a rolling stdev of 25
 
     Args:
         df_daily (frame): contains "close" column
         price_col (str): "close" is default
+        dtype (:obj:dtype, optional): dtype of the result, e.g. np.float32
+        copy (:obj:bool, optional): False computes from views of df_daily
+            instead of copying it. Default is True
+        out (:obj:dict, optional): column name -> preallocated float array of
+            len(df_daily) to write results into, only used when copy=False
 
     Returns:
         frame: index = index of df_daily, adds colum called vol36
 
     """
+    _check_out(out, copy)
+    if not copy:
+        price = pd.Series(_values(df_daily, price_col), copy=False)
+        buf = _buffers(["vol36"], len(df_daily), dtype, out)
+        buf["vol36"][:] = price.pct_change().ewm(span=36, adjust=False).std().to_numpy()
+        rows = _valid_rows(~np.isnan(buf["vol36"]))
+        return pd.DataFrame(
+            {"vol36": buf["vol36"][rows]}, index=df_daily.index[rows], copy=False
+        )
+
     df = df_daily[[price_col]].copy()
     df["pct_returns"] = df[price_col].pct_change()
     df["vol36"] = df.pct_returns.ewm(span=36, adjust=False).std()
     df.drop(["pct_returns", price_col], axis=1, inplace=True)
     df.dropna(inplace=True)
-    return df
+    return _astype(df, dtype)
 
 
-def indicator_bollinger(df_t, lookback=20):
+def indicator_bollinger(df_t, lookback=20, dtype=None, copy=True, out=None):
     """Creates columns for bollinger channel.  Requires columns "high" and "low" in intraday_df
 
     Args:
         df (pd.DataFrame): OHLCV intraday dataframe, only needs close
         lookback (:obj:int, optional): rolling window.  Default is 20
+        dtype (:obj:dtype, optional): dtype of the result, e.g. np.float32
+        copy (:obj:bool, optional): False computes from views of df_t instead
+            of copying it. Default is True
+        out (:obj:dict, optional): column name -> preallocated float array of
+            len(df_t) to write results into, only used when copy=False
 
     Returns:
         pd.DataFrame: columns are:
             - bollinger_high
             - bollinger_low
     """
+    _check_out(out, copy)
+    if not copy:
+        buf = _buffers(["bollinger_high", "bollinger_low"], len(df_t), dtype, out)
+        roll = _rolling(_values(df_t, "close"), lookback)
+        bb_ma = roll.mean().to_numpy()
+        bb_std = roll.std().to_numpy()
+        np.add(bb_ma, bb_std, out=buf["bollinger_high"])
+        np.subtract(bb_ma, bb_std, out=buf["bollinger_low"])
+        return pd.DataFrame(buf, index=df_t.index, copy=False)
+
     df = df_t[["close"]].copy()
     df["bb_ma"] = df.close.rolling(window=lookback).mean()
     df["bb_std"] = df.close.rolling(window=lookback).std()
     df["bollinger_high"] = df.bb_ma + df.bb_std
     df["bollinger_low"] = df.bb_ma - df.bb_std
     df = df.drop(["close", "bb_ma", "bb_std"], axis=1)
-    return df
+    return _astype(df, dtype)
 
 
-def indicator_volbands(df_t, lookback=20, multiplier=0.3):
+def indicator_volbands(
+    df_t, lookback=20, multiplier=0.3, dtype=None, copy=True, out=None
+):
     """Create bands around a mean based on volatility
 
     Args:
         df_t (frame): requires "close" and "vol36" -- which is daily volatility
         lookback (`obj`:int, optional): lookback for moving average
         multiplier (`obj`:float, optional): multiplier for the daily volatility. 0.3 works well for about a 30T timeframe
+        dtype (`obj`:dtype, optional): dtype of the result, e.g. np.float32
+        copy (`obj`:bool, optional): False computes from views of df_t instead
+            of copying it. Default is True
+        out (`obj`:dict, optional): column name -> preallocated float array of
+            len(df_t) to write results into, only used when copy=False
 
     Returns:
         frame: vol_high and vol_low, which is the daily volatility above a moving average
     """
+    _check_out(out, copy)
+    if not copy:
+        buf = _buffers(["vol_high", "vol_low"], len(df_t), dtype, out)
+        close = _values(df_t, "close")
+        vol_ma = _rolling(close, lookback).mean().to_numpy()
+        vol_width = (
+            np.multiply(close, _values(df_t, "vol36"), dtype=np.float64) * multiplier
+        )
+        np.add(vol_ma, vol_width, out=buf["vol_high"])
+        np.subtract(vol_ma, vol_width, out=buf["vol_low"])
+        return pd.DataFrame(buf, index=df_t.index, copy=False)
+
     df = df_t[["close", "vol36"]].copy()
     df["vol_ma"] = df.close.rolling(window=lookback).mean()
     df["vol_width"] = df.close * df.vol36 * multiplier
     df["vol_high"] = df.vol_ma + df.vol_width
     df["vol_low"] = df.vol_ma - df.vol_width
-    return df[["vol_high", "vol_low"]]
+    return _astype(df[["vol_high", "vol_low"]], dtype)
 
 
-def indicator_donchian(df, lookback=20):
+def indicator_donchian(df, lookback=20, dtype=None, copy=True, out=None):
     """Creates columns for donchian channel.  Requires columns "high" and "low" in intraday_df
 
     Args:
@@ -74,6 +189,11 @@ def indicator_donchian(df, lookback=20):
             - high: used for hold-high
             - low: used for hold-low
         lookback (:obj:int, optional): rolling window.  Default is 20
+        dtype (:obj:dtype, optional): dtype of the result, e.g. np.float32
+        copy (:obj:bool, optional): False computes from views of df instead
+            of copying it. Default is True
+        out (:obj:dict, optional): column name -> preallocated float array of
+            len(df) to write results into, only used when copy=False
 
     Returns:
         pd.DataFrame: columns are:
@@ -85,26 +205,64 @@ def indicator_donchian(df, lookback=20):
         >>> donchian = dvind.indicator_donchian(df, lookback=1380*3)
         >>> df = pd.merge(df, donchian, left_index=True, right_index=True)
     """
+    _check_out(out, copy)
+    if not copy:
+        buf = _buffers(["donchian_high", "donchian_low"], len(df), dtype, out)
+        high = _values(df, "high")
+        rows = _valid_rows(~(np.isnan(high) | np.isnan(_values(df, "low"))))
+        roll = _rolling(high[rows], lookback)
+        for col in buf:
+            buf[col][:] = np.nan
+        buf["donchian_high"][rows] = roll.max().to_numpy()
+        buf["donchian_low"][rows] = roll.min().to_numpy()
+        return pd.DataFrame(
+            {col: buf[col][rows] for col in buf}, index=df.index[rows], copy=False
+        )
+
     df = df[["high", "low"]].copy()
     df = df.dropna()
     df["donchian_high"] = df.high.rolling(lookback).max()
     df["donchian_low"] = df.high.rolling(lookback).min()
     df = df.drop(["high", "low"], axis=1)
-    return df
+    return _astype(df, dtype)
 
 
-def indicator_atr(df, lookback=20):
+def indicator_atr(df, lookback=20, dtype=None, copy=True, out=None):
     """Creates average true range
 
     Args:
         df (pd.DataFrame): OHLCV intraday dataframe, only needs high, low, close
         lookback (:obj:int, optional): rolling window.  Default is 20
+        dtype (:obj:dtype, optional): dtype of the result, e.g. np.float32
+        copy (:obj:bool, optional): False computes from views of df instead
+            of copying it. Default is True
+        out (:obj:dict, optional): column name -> preallocated float array of
+            len(df) to write results into, only used when copy=False
 
     Returns:
         pd.DataFrame: columns with true_range and atr
 
     Example:
+        >>> atr = indicator_atr(df_all, lookback=20, dtype=np.float32, copy=False)
     """
+    _check_out(out, copy)
+    if not copy:
+        buf = _buffers(["atr", "true_range"], len(df), dtype, out)
+        high = _values(df, "high")
+        low = _values(df, "low")
+        prev_close = _values(df, "close")[:-1]
+
+        # true range, fmax skips the missing previous close on the first bar
+        true_range = np.abs(np.subtract(high, low, dtype=np.float64))
+        for price in (high[1:], low[1:]):
+            gap = np.abs(np.subtract(price, prev_close, dtype=np.float64))
+            np.fmax(true_range[1:], gap, out=true_range[1:])
+
+        # average
+        buf["true_range"][:] = true_range
+        buf["atr"][:] = _rolling(true_range, lookback).mean().to_numpy()
+        return pd.DataFrame(buf, index=df.index, copy=False)
+
     df = df[["high", "low", "close"]].copy()
 
     # true range
@@ -116,7 +274,7 @@ def indicator_atr(df, lookback=20):
     # average
     df["atr"] = df["true_range"].rolling(lookback).mean()
 
-    return df[["atr", "true_range"]]
+    return _astype(df[["atr", "true_range"]], dtype)
 
 
 def indicator_pp_daily(intraday_df):
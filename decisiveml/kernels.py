@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+
+_BACKENDS = ("auto", "numba", "numpy")
+_backend = "auto"
+
+
+def set_backend(name):
+    """Select the implementation used for the path-dependent kernels
+
+    Args:
+        name (str): one of:
+            - auto: numba when it is installed, otherwise numpy (default)
+            - numba: JIT compiled kernels, raises ImportError if unavailable
+            - numpy: pure numpy kernels
+
+    Example:
+        >>> dml.set_backend("numpy")
+        >>> dml.get_backend()
+        'numpy'
+    """
+    if name not in _BACKENDS:
+        raise ValueError(
+            "Unknown backend {}, expected one of {}".format(name, _BACKENDS)
+        )
+    if name == "numba" and not NUMBA_AVAILABLE:
+        raise ImportError("numba backend requested but numba is not installed")
+    global _backend
+    _backend = name
+    logger.debug("Kernel backend set to {}".format(get_backend()))
+
+
+def get_backend():
+    """Returns the resolved backend name, "numba" or "numpy" """
+    if _backend == "auto":
+        return "numba" if NUMBA_AVAILABLE else "numpy"
+    return _backend
+
+
+# numpy kernels
+
+# Below this many trades numpy call overhead outweighs the loop it replaces
+_NUMPY_MIN_TRADES = 200
+
+
+def _drawdown_ruin_numpy(starting_equity, trades, ruin_equity):
+    equity = np.cumsum(np.concatenate(([starting_equity], trades)))[1:]
+    if not equity.shape[0]:
+        return 0.0, 0
+    hwm = np.maximum(np.maximum.accumulate(equity), starting_equity)
+    drawdown_pct = float((100 * (1 - (equity / hwm))).max())
+    return drawdown_pct, int(equity.min() < ruin_equity)
+
+
+def _argmax_abs_numpy(tvals):
+    return np.abs(np.where(np.isfinite(tvals), tvals, 0.0)).argmax(axis=1)
+
+
+# loops, compiled by numba with nogil so they can run in a thread pool. Without
+# numba they run as plain python on short paths
+
+
+def _drawdown_ruin_loop(starting_equity, trades, ruin_equity):
+    equity = starting_equity
+    hwm = starting_equity
+    max_drawdown_pct = 0.0
+    is_ruined = 0
+    for i in range(len(trades)):
+        equity = equity + trades[i]
+        if equity < ruin_equity:
+            is_ruined = 1
+        if equity > hwm:
+            hwm = equity
+        if equity < hwm:
+            drawdown_pct = 100 * (1 - (equity / hwm))
+            if drawdown_pct > max_drawdown_pct:
+                max_drawdown_pct = drawdown_pct
+    return max_drawdown_pct, is_ruined
+
+
+def _argmax_abs_loop(tvals):
+    out = np.zeros(tvals.shape[0], dtype=np.int64)
+    for i in range(tvals.shape[0]):
+        best = -1.0
+        for j in range(tvals.shape[1]):
+            v = tvals[i, j]
+            if np.isfinite(v):
+                v = abs(v)
+            else:
+                v = 0.0
+            if v > best:
+                best = v
+                out[i] = j
+    return out
+
+
+if NUMBA_AVAILABLE:
+    _drawdown_ruin_numba = numba.njit(nogil=True, cache=True)(_drawdown_ruin_loop)
+    _argmax_abs_numba = numba.njit(nogil=True, cache=True)(_argmax_abs_loop)
+
+
+# dispatch
+
+
+def drawdown_ruin(starting_equity, trades, ruin_equity):
+    """Returns the maximum drawdown and ruin flag of an equity path in one pass
+
+    Args:
+        starting_equity (float): equity before the first trade
+        trades (list): profit/loss of each trade in order, list or array
+        ruin_equity (float): equity level that counts as ruin
+
+    Returns:
+        tuple: (drawdown_pct, is_ruined)
+            - drawdown_pct: maximum drawdown from the high water mark, in percent
+            - is_ruined: 1 if equity falls below ruin_equity at any point, else 0
+    """
+    starting_equity = float(starting_equity)
+    ruin_equity = float(ruin_equity)
+    if get_backend() == "numba":
+        trades = np.asarray(trades, dtype=np.float64)
+        drawdown_pct, is_ruined = _drawdown_ruin_numba(
+            starting_equity, trades, ruin_equity
+        )
+        return float(drawdown_pct), int(is_ruined)
+    if len(trades) < _NUMPY_MIN_TRADES:
+        if isinstance(trades, np.ndarray):
+            trades = trades.tolist()
+        return _drawdown_ruin_loop(starting_equity, trades, ruin_equity)
+    trades = np.asarray(trades, dtype=np.float64)
+    return _drawdown_ruin_numpy(starting_equity, trades, ruin_equity)
+
+
+def argmax_abs(tvals):
+    """Returns the column of the largest absolute value in each row, treating
+    inf and nan as 0.  Ties resolve to the first column, like pd.Series.idxmax
+
+    Args:
+        tvals (array): 2d array, one row per event and one column per horizon
+
+    Returns:
+        array: int64 column positions, one per row
+    """
+    tvals = np.ascontiguousarray(tvals, dtype=np.float64)
+    if get_backend() == "numba":
+        return _argmax_abs_numba(tvals)
+    return _argmax_abs_numpy(tvals).astype(np.int64)
@@ -2,6 +2,7 @@ import pandas as pd
 import random
 import statistics
 import logging
+from decisiveml import kernels
 
 logger = logging.getLogger(__name__)
 
@@ -77,21 +78,17 @@ class MonteCarlo(object):
         trades = random.choices(self.trades_list, k=self.num_trades_per_year)
         # logger.debug("{} {}".format(len(trades), trades))
 
-        # Check for ruin at any point in the trades list
-        is_ruined = 0
-        equity = starting_equity
-        for trade in trades:
-            equity = equity + trade
-            if equity < self.ruin_equity:
-                is_ruined = 1
-                break
+        # Drawdown and ruin at any point, from a single pass over the equity path
+        drawdown_pct, is_ruined = kernels.drawdown_ruin(
+            starting_equity, trades, self.ruin_equity
+        )
 
         stats = {
             "profit": sum(trades),
             "returns_pct": int(
                 100 * ((starting_equity + sum(trades)) / starting_equity - 1)
             ),
-            "drawdown_pct": self._drawdown(starting_equity, trades),
+            "drawdown_pct": drawdown_pct,
             "is_ruined": is_ruined,
             "is_profitable": 1 if sum(trades) >= 0 else 0,
         }
@@ -104,26 +101,7 @@ class MonteCarlo(object):
 
     def _drawdown(self, starting_equity, trades):
         """Returns the maximum drawdown in a set of trades"""
-        equity = starting_equity
-        hwm = starting_equity
-        max_drawdown_pct = 0
-        drawdown_pct = 0
-
-        for trade in trades:
-            equity = equity + trade
-
-            # Set High Water Mark
-            if equity > hwm:
-                hwm = equity
-
-            # Look for drawdown
-            if equity < hwm:
-                drawdown_pct = 100 * (1 - (equity / hwm))
-                if drawdown_pct > max_drawdown_pct:
-                    max_drawdown_pct = drawdown_pct
-
-            # logger.debug("{} eq:{} \t hwm:{} \t dd:{} mdd:{}".format(trade, equity, hwm, drawdown_pct, max_drawdown_pct))
-        return max_drawdown_pct
+        return kernels.drawdown_ruin(starting_equity, trades, float("-inf"))[0]
 
     def _median_stats_run(self, starting_equity):
         montecarlo = {}
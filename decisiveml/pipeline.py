@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+import asyncio
+import functools
+import inspect
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineError(Exception):
+    pass
+
+
+def _without_traceback(e):
+    """Returns e with the tracebacks of it and its chained exceptions cleared"""
+    seen = set()
+    chained = e
+    while chained is not None and id(chained) not in seen:
+        seen.add(id(chained))
+        chained.__traceback__ = None
+        chained = chained.__cause__ or chained.__context__
+    return e
+
+
+class Stage(object):
+    def __init__(self, name, func, depends=(), kind="cpu"):
+        if kind not in ("cpu", "io"):
+            raise PipelineError("Stage {} kind must be cpu or io".format(name))
+        self.name = name
+        self.func = func
+        self.depends = tuple(depends)
+        self.kind = kind
+
+    def __repr__(self):
+        return "Stage({}, depends={}, kind={})".format(
+            self.name, list(self.depends), self.kind
+        )
+
+
+class Pipeline(object):
+    """Run a DAG of research stages for many symbols concurrently
+
+    Every stage is called as ``func(symbol, **deps)``, where deps maps the
+    names of the stages it depends on to their results for that symbol.
+
+    - io stages and the sink run on the asyncio event loop.  Coroutine functions
+      are awaited directly, plain functions run in the loop's default executor
+    - cpu stages run in a bounded thread or process pool
+
+    At most ``max_symbols`` symbols are in flight at once, so no more than that
+    many symbols' data is held in memory.  Each symbol's results are handed to
+    the sink as soon as that symbol finishes, then released.
+
+    Example:
+        >>> pipe = dml.Pipeline(max_workers=8, max_symbols=8)
+        >>> pipe.add_stage("bars", load_bars, kind="io")
+        >>> pipe.add_stage("pivots", pivots, depends=["bars"])
+        >>> pipe.add_stage("atr", lambda s, bars: dml.indicator_atr(bars), depends=["bars"])
+        >>> pipe.add_stage("trend", trend_labels, depends=["bars"])
+        >>> pipe.add_stage("risk", montecarlo, depends=["bars", "pivots", "atr"])
+        >>> failed = pipe.run(symbols, sink=lambda symbol, res: res["risk"].to_csv(...))
+    """
+
+    def __init__(self, max_workers=None, max_symbols=None, executor="thread"):
+        if executor not in ("thread", "process"):
+            raise PipelineError("executor must be thread or process")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_symbols = max_symbols or self.max_workers
+        self.executor = executor
+        self.stages = {}
+
+    def add_stage(self, name, func, depends=(), kind="cpu"):
+        """Add a stage to the DAG
+
+        Args:
+            name (str): unique stage name, also the keyword its result is passed as
+            func (callable): ``func(symbol, **deps)``. Must be picklable for the
+                process executor
+            depends (:obj:list, optional): names of stages whose results are needed
+            kind (:obj:str, optional): "cpu" (default) or "io"
+
+        Returns:
+            Pipeline: self, so calls can be chained
+        """
+        if name in self.stages:
+            raise PipelineError("Stage {} already exists".format(name))
+        self.stages[name] = Stage(name, func, depends, kind)
+        return self
+
+    def _order(self):
+        """Returns the stages in topological order, checking the DAG is valid"""
+        for stage in self.stages.values():
+            for dep in stage.depends:
+                if dep not in self.stages:
+                    raise PipelineError(
+                        "Stage {} depends on unknown stage {}".format(stage.name, dep)
+                    )
+
+        order = []
+        state = {}
+
+        def visit(name):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise PipelineError("Cycle in pipeline at stage {}".format(name))
+            state[name] = "visiting"
+            for dep in self.stages[name].depends:
+                visit(dep)
+            state[name] = "done"
+            order.append(self.stages[name])
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _leaves(self):
+        needed = {dep for stage in self.stages.values() for dep in stage.depends}
+        return [name for name in self.stages if name not in needed]
+
+    def run(self, symbols, sink, outputs=None):
+        """Run the pipeline for every symbol
+
+        Args:
+            symbols (iterable): symbols to process
+            sink (callable): ``sink(symbol, results)`` called once per finished
+                symbol, where results maps stage name to result. May be a coroutine
+                function
+            outputs (:obj:list, optional): stage names passed to the sink. Default
+                is the leaf stages, i.e. those no other stage depends on
+
+        Returns:
+            dict: symbol -> exception for every symbol that failed
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.run_async(symbols, sink, outputs))
+        finally:
+            loop.close()
+
+    async def run_async(self, symbols, sink, outputs=None):
+        """Coroutine version of :meth:`run` for use inside a running event loop"""
+        order = self._order()
+        outputs = list(outputs) if outputs is not None else self._leaves()
+        for name in outputs:
+            if name not in self.stages:
+                raise PipelineError("Unknown output stage {}".format(name))
+
+        if self.executor == "thread":
+            pool_cls = ThreadPoolExecutor
+        else:
+            pool_cls = ProcessPoolExecutor
+        failed = {}
+        slots = asyncio.Semaphore(self.max_symbols)
+
+        with pool_cls(max_workers=self.max_workers) as pool:
+
+            async def run_symbol(symbol):
+                try:
+                    results = await self._run_symbol(symbol, order, pool)
+                    results = {name: results[name] for name in outputs}
+                    await self._sink(sink, symbol, results)
+                    logger.debug("Pipeline \t| {} done".format(symbol))
+                except Exception as e:
+                    logger.exception("Pipeline \t| {} failed".format(symbol))
+                    # The traceback frames hold the symbol's data, drop them
+                    failed[symbol] = _without_traceback(e)
+                finally:
+                    slots.release()
+
+            tasks = []
+            for symbol in symbols:
+                # Wait for a free slot before starting, bounding symbols in memory
+                await slots.acquire()
+                tasks.append(asyncio.ensure_future(run_symbol(symbol)))
+            await asyncio.gather(*tasks)
+
+        logger.info(
+            "Pipeline \t| Symbols: {} \t| Failed: {}".format(len(tasks), len(failed))
+        )
+        return failed
+
+    async def _sink(self, sink, symbol, results):
+        """Await coroutine sinks, run plain ones off the event loop so a blocking
+        write does not stall the other symbols"""
+        if asyncio.iscoroutinefunction(sink):
+            await sink(symbol, results)
+            return
+        loop = asyncio.get_event_loop()
+        out = await loop.run_in_executor(None, functools.partial(sink, symbol, results))
+        if inspect.isawaitable(out):
+            await out
+
+    async def _run_symbol(self, symbol, order, pool):
+        loop = asyncio.get_event_loop()
+        tasks = {}
+
+        async def run_stage(stage):
+            deps = {}
+            for dep in stage.depends:
+                deps[dep] = await tasks[dep]
+            if stage.kind == "io" and asyncio.iscoroutinefunction(stage.func):
+                return await stage.func(symbol, **deps)
+            call = functools.partial(stage.func, symbol, **deps)
+            return await loop.run_in_executor(
+                None if stage.kind == "io" else pool, call
+            )
+
+        # Stages are created in topological order, so dependencies already exist
+        for stage in order:
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+        # Wait for every stage, even after a failure, so no pool work is still
+        # holding this symbol's data once its slot is released
+        values = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for value in values:
+            if isinstance(value, BaseException):
+                raise value
+        return dict(zip(tasks.keys(), values))
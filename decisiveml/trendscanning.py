@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import statsmodels.api as sm1
+from decisiveml import kernels
 
 
 def tValLinR(close):
@@ -50,25 +51,101 @@ def getBinsFromTrend(molecule, close, span):
     out = pd.DataFrame(index=molecule, columns=["t1", "tVal", "bin"])
     hrzns = range(*span)
 
+    # t-values for every horizon of every event that fits inside close
+    events = []
+    tvals = []
     for dt0 in molecule:
-        df0 = pd.Series()
         iloc0 = close.index.get_loc(dt0)
         if iloc0 + max(hrzns) > close.shape[0]:
             continue
 
-        for hrzn in hrzns:
-            dt1 = close.index[iloc0 + hrzn - 1]
-            df1 = close.loc[dt0:dt1]
-            df0.loc[dt1] = tValLinR(df1.values)
+        df0 = [tValLinR(close.values[iloc0 : iloc0 + hrzn]) for hrzn in hrzns]
+        events.append((dt0, close.index[iloc0 + max(hrzns) - 1]))
+        tvals.append(df0)
 
-        dt1 = df0.replace([-np.inf, np.inf, np.nan], 0).abs().idxmax()
-        out.loc[dt0, ["t1", "tVal", "bin"]] = (
-            df0.index[-1],
-            df0[dt1],
-            np.sign(df0[dt1]),
-        )  # prevent leakage
+    if events:
+        best = kernels.argmax_abs(np.array(tvals, dtype=np.float64))
+        for (dt0, dt1), df0, i in zip(events, tvals, best):
+            out.loc[dt0, ["t1", "tVal", "bin"]] = (
+                dt1,
+                df0[i],
+                np.sign(df0[i]),
+            )  # prevent leakage
 
     out["t1"] = pd.to_datetime(out["t1"])
     out["bin"] = pd.to_numeric(out["bin"], downcast="signed")
 
     return out.dropna(subset=["bin"])
+
+
+def getNumCoEvents(trend, index):
+    """Number of concurrent labels at each bar, via a difference array and cumsum
+    instead of the event x bar loop of SNIPPET 4.1 ESTIMATING THE UNIQUENESS OF
+    A LABEL
+
+    Args:
+        trend (pd.DataFrame): output of getBinsFromTrend, needs the t1 column.
+            Events start at their index and end at t1, inclusive
+        index (DatetimeIndex): sorted bar index, e.g. close.index. Events that
+            start after the last bar or end before the first bar are ignored
+
+    Returns:
+        pd.Series: count of labels spanning each bar, indexed by index
+
+    Example:
+        >>> trend = getBinsFromTrend(molecule=events, close=df.close, span=[5, 20, 5])
+        >>> numCoEvents = getNumCoEvents(trend, df.close.index)
+    """
+    start, stop, m_valid = _eventBounds(trend, index)
+    start, stop = start[m_valid], stop[m_valid]
+    numCoEvents = np.cumsum(
+        np.bincount(start, minlength=index.shape[0] + 1)
+        - np.bincount(stop + 1, minlength=index.shape[0] + 1)
+    )[:-1]
+    return pd.Series(numCoEvents, index=index)
+
+
+def getAvgUniqueness(trend, index, numCoEvents=None):
+    """Average uniqueness of each label over its lifespan, via SNIPPET 4.2
+    ESTIMATING THE AVERAGE UNIQUENESS OF A LABEL, using prefix sums of
+    1/numCoEvents so the cost is O(bars + events)
+
+    Args:
+        trend (pd.DataFrame): output of getBinsFromTrend, needs the t1 column
+        index (DatetimeIndex): sorted bar index, e.g. close.index
+        numCoEvents (:obj:pd.Series, optional): output of getNumCoEvents, computed
+            if not given. Reindexed to index, bars it lacks count as 0
+
+    Returns:
+        pd.Series: tW sample weights, aligned to trend.index. nan for events
+            outside index
+
+    Example:
+        >>> trend = getBinsFromTrend(molecule=events, close=df.close, span=[5, 20, 5])
+        >>> trend["tW"] = getAvgUniqueness(trend, df.close.index)
+    """
+    if numCoEvents is None:
+        numCoEvents = getNumCoEvents(trend, index)
+    start, stop, m_valid = _eventBounds(trend, index)
+    start, stop = start[m_valid], stop[m_valid]
+
+    # align to index so a series on another index cannot shift the prefix sums
+    counts = numCoEvents.reindex(index).fillna(0).values.astype(np.float64)
+    uniqueness = np.divide(1.0, counts, out=np.zeros_like(counts), where=counts > 0)
+    prefix = np.concatenate(([0.0], np.cumsum(uniqueness)))
+    tW = np.full(trend.shape[0], np.nan)
+    tW[m_valid] = (prefix[stop + 1] - prefix[start]) / (stop - start + 1)
+    return pd.Series(tW, index=trend.index, name="tW")
+
+
+def _eventBounds(trend, index):
+    """Returns the first and last bar positions spanned by each event, and a mask
+    of the events that overlap index"""
+    # keep the DatetimeIndex, .values would drop the timezone
+    t1 = pd.DatetimeIndex(trend["t1"])
+    if index.shape[0]:
+        t1 = t1.fillna(index[-1])
+    start = index.searchsorted(trend.index, side="left")
+    stop = index.searchsorted(t1, side="right") - 1
+    m_valid = (start < index.shape[0]) & (stop >= 0)
+    return start, np.maximum(stop, start), m_valid
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+import unittest
+from nose.tools import eq_
+import numpy as np
+import pandas as pd
+import decisiveml as dml
+
+
+class TestIndicatorViews(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        index = pd.date_range("2020-02-02 18:00", periods=500, freq="30min")
+        close = 3000 + np.random.randn(index.shape[0]).cumsum()
+        self.df = pd.DataFrame(
+            {
+                "open": close,
+                "high": close + np.random.rand(index.shape[0]) * 5,
+                "low": close - np.random.rand(index.shape[0]) * 5,
+                "close": close,
+                "vol36": np.random.rand(index.shape[0]) / 100,
+            },
+            index=index,
+        )
+        self.df.iloc[10, self.df.columns.get_loc("high")] = np.nan
+
+    def _check(self, func, **kwargs):
+        expected = func(self.df, **kwargs)
+        result = func(self.df, copy=False, **kwargs)
+        pd.testing.assert_frame_equal(result, expected)
+
+        result32 = func(self.df, copy=False, dtype=np.float32, **kwargs)
+        eq_(list(result32.dtypes), [np.dtype(np.float32)] * expected.shape[1])
+        pd.testing.assert_frame_equal(
+            result32, func(self.df, dtype=np.float32, **kwargs)
+        )
+
+    def test_volatility_daily(self):
+        """Test copy=False matches the copying implementation"""
+        self._check(dml.indicator_volatility_daily)
+
+    def test_bollinger(self):
+        """Test copy=False matches the copying implementation"""
+        self._check(dml.indicator_bollinger, lookback=20)
+
+    def test_volbands(self):
+        """Test copy=False matches the copying implementation"""
+        self._check(dml.indicator_volbands, lookback=20, multiplier=0.3)
+
+    def test_donchian(self):
+        """Test copy=False matches the copying implementation, dropping nan rows"""
+        self._check(dml.indicator_donchian, lookback=20)
+
+    def test_atr(self):
+        """Test copy=False matches the copying implementation"""
+        self._check(dml.indicator_atr, lookback=20)
+
+    def test_atr_caller_buffers(self):
+        """Test results are written into caller supplied buffers"""
+        n = self.df.shape[0]
+        out = {"atr": np.empty(n, np.float32), "true_range": np.empty(n, np.float32)}
+        atr = dml.indicator_atr(self.df, lookback=20, copy=False, out=out)
+        np.testing.assert_array_equal(out["atr"], atr["atr"].values)
+        np.testing.assert_array_equal(out["true_range"], atr["true_range"].values)
+
+        with self.assertRaises(ValueError):
+            dml.indicator_atr(
+                self.df, copy=False, out={"atr": np.empty(n - 1, np.float32)}
+            )
+        with self.assertRaises(ValueError):
+            dml.indicator_atr(self.df, out=out)
+        with self.assertRaises(ValueError):
+            dml.indicator_atr(self.df, copy=False, out={"atr": np.empty(n, np.int64)})
+        with self.assertRaises(ValueError):
+            dml.indicator_atr(self.df, copy=False, out={"atrr": np.empty(n)})
+
+    def test_donchian_caller_buffers(self):
+        """Test full length buffers are written around the dropped nan rows"""
+        n = self.df.shape[0]
+        out = {"donchian_high": np.empty(n), "donchian_low": np.empty(n)}
+        donchian = dml.indicator_donchian(self.df, lookback=20, copy=False, out=out)
+        pd.testing.assert_frame_equal(
+            donchian, dml.indicator_donchian(self.df, lookback=20)
+        )
+        eq_(np.isnan(out["donchian_high"][10]), True)
+        np.testing.assert_array_equal(
+            np.delete(out["donchian_high"], 10), donchian["donchian_high"].values
+        )
+
+    def test_volatility_daily_caller_buffers(self):
+        """Test full length buffers are written and the result views their tail"""
+        out = {"vol36": np.empty(self.df.shape[0], np.float32)}
+        vol = dml.indicator_volatility_daily(self.df, copy=False, out=out)
+        eq_(vol.shape[0], self.df.shape[0] - 2)
+        np.testing.assert_array_equal(out["vol36"][2:], vol["vol36"].values)
+
+    def test_float32_panel(self):
+        """Test float32 inputs are read in place and match the float64 results"""
+        df32 = self.df.astype(np.float32)
+        for func in (
+            dml.indicator_bollinger,
+            dml.indicator_volbands,
+            dml.indicator_donchian,
+            dml.indicator_atr,
+        ):
+            result = func(df32, copy=False, dtype=np.float32)
+            expected = func(self.df, copy=False, dtype=np.float32)
+            pd.testing.assert_frame_equal(
+                result, expected, check_exact=False, rtol=1e-3
+            )
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+import functools
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from nose.tools import eq_
+import numpy as np
+import pandas as pd
+import decisiveml as dml
+from decisiveml import kernels
+
+
+def _reference_drawdown(starting_equity, trades):
+    """Original pure python loop from MonteCarlo._drawdown"""
+    equity = starting_equity
+    hwm = starting_equity
+    max_drawdown_pct = 0
+    for trade in trades:
+        equity = equity + trade
+        if equity > hwm:
+            hwm = equity
+        if equity < hwm:
+            drawdown_pct = 100 * (1 - (equity / hwm))
+            if drawdown_pct > max_drawdown_pct:
+                max_drawdown_pct = drawdown_pct
+    return max_drawdown_pct
+
+
+class TestKernels(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        # short paths run the python loop without numba, long ones numpy
+        self.paths = [
+            np.round(np.random.randn(n) * 500, 2) for n in [60, 250, 1000] * 7
+        ]
+        self.tvals = np.random.randn(50, 6) * 3
+        self.tvals[0, :] = np.nan
+        self.tvals[1, 2] = np.inf
+        self.tvals[2, :] = [1.0, -4.0, 4.0, -np.inf, 0.5, 2.0]
+        self.backends = ["numpy"] + (["numba"] if kernels.NUMBA_AVAILABLE else [])
+
+    def tearDown(self):
+        dml.set_backend("auto")
+
+    def test_set_backend(self):
+        """Test backend selection and validation"""
+        dml.set_backend("numpy")
+        eq_(dml.get_backend(), "numpy")
+        with self.assertRaises(ValueError):
+            dml.set_backend("cuda")
+        if not kernels.NUMBA_AVAILABLE:
+            with self.assertRaises(ImportError):
+                dml.set_backend("numba")
+
+    def test_drawdown_matches_reference(self):
+        """Test every backend matches the original drawdown loop exactly"""
+        for backend in self.backends:
+            dml.set_backend(backend)
+            for trades in self.paths:
+                drawdown_pct, _ = kernels.drawdown_ruin(10000, trades, 5000)
+                eq_(drawdown_pct, _reference_drawdown(10000, trades.tolist()))
+            eq_(kernels.drawdown_ruin(10000, [100, 200], 5000), (0, 0))
+            eq_(kernels.drawdown_ruin(10000, [], 5000), (0, 0))
+
+    def test_is_ruined(self):
+        """Test ruin is flagged on any dip below ruin equity"""
+        for backend in self.backends:
+            dml.set_backend(backend)
+            for trades in ([-2000, -3500, 9000], [-2000, -3500, 9000] * 100):
+                eq_(kernels.drawdown_ruin(10000, trades, 5000)[1], 1)
+            for trades in ([-2000, -3000, 9000], [-2000, -3000, 5000] * 100):
+                eq_(kernels.drawdown_ruin(10000, trades, 5000)[1], 0)
+
+    def test_argmax_abs(self):
+        """Test inf/nan are zeroed and ties resolve to the first horizon"""
+        for backend in self.backends:
+            dml.set_backend(backend)
+            best = kernels.argmax_abs(self.tvals)
+            eq_(best[0], 0)
+            eq_(best[1] != 2, True)
+            eq_(best[2], 1)
+            expected = (
+                pd.DataFrame(self.tvals.T)
+                .replace([-np.inf, np.inf, np.nan], 0)
+                .abs()
+                .idxmax()
+                .values
+            )
+            eq_(best.tolist(), expected.tolist())
+
+    def test_backends_identical(self):
+        """Test numba and numpy backends return identical results"""
+        if not kernels.NUMBA_AVAILABLE:
+            raise unittest.SkipTest("numba is not installed")
+        results = {}
+        for backend in self.backends:
+            dml.set_backend(backend)
+            results[backend] = (
+                [kernels.drawdown_ruin(10000, trades, 8000) for trades in self.paths],
+                kernels.argmax_abs(self.tvals).tolist(),
+            )
+        eq_(results["numba"], results["numpy"])
+
+    def test_thread_pool(self):
+        """Test kernels give the same results when run from a thread pool"""
+        for backend in self.backends:
+            dml.set_backend(backend)
+            run = functools.partial(kernels.drawdown_ruin, 10000, ruin_equity=8000)
+            serial = [run(trades) for trades in self.paths]
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                threaded = list(pool.map(run, self.paths))
+            eq_(threaded, serial)
+
+    def test_montecarlo_backends(self):
+        """Test MonteCarlo runs are identical across backends"""
+        trades = pd.Series(
+            np.round(np.random.randn(200) * 400 + 50, 2),
+            index=pd.date_range("2019-01-01", periods=200),
+        )
+        start_date = trades.index[0].to_pydatetime()
+        end_date = trades.index[-1].to_pydatetime()
+        results = []
+        for backend in self.backends:
+            dml.set_backend(backend)
+            random.seed(0)
+            mc = dml.MonteCarlo(trades.tolist())
+            mc._MONTECARLO_RUNS = 100
+            mc.settings(ruin_equity=5000, start_date=start_date, end_date=end_date)
+            results.append(mc.run(base_equity=10000, steps=3))
+        for df in results[1:]:
+            pd.testing.assert_frame_equal(df, results[0])
@@ -26,3 +26,71 @@ def test_trendscanning():
     eq_(trend.iloc[1].bin, 1)
     eq_(trend.iloc[-1].bin, -1)
     eq_(trend.bin.sum(), 12)
+
+
+def _naive_uniqueness(trend, index):
+    """Event x bar loop from SNIPPET 4.1 / 4.2"""
+    numCoEvents = pd.Series(0, index=index)
+    for t0, t1 in trend["t1"].items():
+        numCoEvents.loc[t0:t1] += 1
+    tW = [(1.0 / numCoEvents.loc[t0:t1]).mean() for t0, t1 in trend["t1"].items()]
+    return numCoEvents, tW
+
+
+def test_uniqueness():
+    """Test concurrency and average uniqueness against the event x bar loop"""
+    index = pd.date_range("2019-01-01", periods=10)
+    trend = pd.DataFrame(
+        {"t1": index[[3, 4, 9, 8]], "bin": [1, -1, 1, 1]}, index=index[[0, 2, 2, 6]]
+    )
+
+    numCoEvents = dml.getNumCoEvents(trend, index)
+    eq_(numCoEvents.tolist(), [1, 1, 3, 3, 2, 1, 2, 2, 2, 1])
+
+    expected, tW = _naive_uniqueness(trend, index)
+    eq_(numCoEvents.tolist(), expected.tolist())
+    np.testing.assert_allclose(dml.getAvgUniqueness(trend, index).values, tW)
+    eq_(dml.getAvgUniqueness(trend, index).index.equals(trend.index), True)
+
+    # a caller supplied series is aligned to index, not used positionally
+    filtered = numCoEvents[numCoEvents > 1]
+    shuffled = numCoEvents.iloc[::-1]
+    np.testing.assert_allclose(
+        dml.getAvgUniqueness(trend, index, numCoEvents=shuffled).values, tW
+    )
+    kept = (1.0 / filtered).reindex(index).fillna(0)
+    np.testing.assert_allclose(
+        dml.getAvgUniqueness(trend, index, numCoEvents=filtered).values,
+        [kept.loc[t0:t1].mean() for t0, t1 in trend["t1"].items()],
+    )
+
+
+def test_uniqueness_trendscanning_intraday():
+    """Test uniqueness of getBinsFromTrend labels on a timezone-aware intraday index"""
+    index = pd.date_range(
+        "2020-02-02 18:00", periods=300, freq="30min", tz="America/New_York"
+    )
+    np.random.seed(0)
+    close = pd.Series(3000 * (1 + (np.random.randn(300) / 100).cumsum()), index=index)
+    trend = dml.getBinsFromTrend(molecule=index[::7], close=close, span=[5, 20, 5])
+
+    expected, tW = _naive_uniqueness(trend, index)
+    eq_(dml.getNumCoEvents(trend, index).tolist(), expected.tolist())
+    np.testing.assert_allclose(dml.getAvgUniqueness(trend, index).values, tW)
+
+
+def test_uniqueness_outside_index():
+    """Test events outside the bar index are ignored instead of crashing"""
+    index = pd.date_range("2019-01-01", periods=10)
+    trend = pd.DataFrame(
+        {"t1": [index[3], index[9] + pd.Timedelta(days=5)]},
+        index=[index[0], index[9] + pd.Timedelta(days=1)],
+    )
+    eq_(dml.getNumCoEvents(trend, index).tolist(), [1, 1, 1, 1, 0, 0, 0, 0, 0, 0])
+    tW = dml.getAvgUniqueness(trend, index)
+    eq_(tW.iloc[0], 1.0)
+    eq_(np.isnan(tW.iloc[1]), True)
+
+    empty = index[:0]
+    eq_(dml.getNumCoEvents(trend, empty).empty, True)
+    eq_(dml.getAvgUniqueness(trend, empty).isnull().all(), True)
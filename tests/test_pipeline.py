@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+import asyncio
+import gc
+import logging
+import threading
+import time
+import unittest
+import weakref
+from nose.tools import eq_
+import decisiveml as dml
+
+
+class Bars(list):
+    """Weak-referenceable stand in for a symbol's loaded data"""
+
+
+def discard(symbol, results):
+    pass
+
+
+def load(symbol):
+    return list(range(len(symbol)))
+
+
+def double(symbol, bars):
+    return [2 * bar for bar in bars]
+
+
+def total(symbol, bars, doubled):
+    return sum(bars) + sum(doubled)
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.symbols = ["ES", "NQ", "CL", "GC", "ZB", "ZN", "6E", "RTY"]
+        self.pipe = dml.Pipeline(max_workers=4, max_symbols=3)
+        self.pipe.add_stage("bars", load, kind="io")
+        self.pipe.add_stage("doubled", double, depends=["bars"])
+        self.pipe.add_stage("total", total, depends=["bars", "doubled"])
+
+    def test_run(self):
+        """Test every symbol streams its leaf results to the sink"""
+        results = {}
+        failed = self.pipe.run(
+            self.symbols, sink=lambda symbol, res: results.update({symbol: res})
+        )
+        eq_(failed, {})
+        eq_(sorted(results), sorted(self.symbols))
+        eq_(results["RTY"], {"total": 9})
+        eq_(results["ES"], {"total": 3})
+
+    def test_outputs(self):
+        """Test choosing which stage results reach the sink"""
+        results = {}
+        self.pipe.run(
+            ["ES"],
+            sink=lambda symbol, res: results.update({symbol: res}),
+            outputs=["bars", "total"],
+        )
+        eq_(results["ES"], {"bars": [0, 1], "total": 3})
+
+    def test_async_io_stage_and_sink(self):
+        """Test coroutine io stages and sinks are awaited"""
+        results = {}
+
+        async def load_async(symbol):
+            await asyncio.sleep(0.01)
+            return load(symbol)
+
+        async def sink(symbol, res):
+            results[symbol] = res["total"]
+
+        pipe = dml.Pipeline(max_workers=2)
+        pipe.add_stage("bars", load_async, kind="io")
+        pipe.add_stage("doubled", double, depends=["bars"])
+        pipe.add_stage("total", total, depends=["bars", "doubled"])
+        pipe.run(self.symbols, sink=sink)
+        eq_(results["CL"], 3)
+
+    def test_max_symbols(self):
+        """Test no more than max_symbols symbols are in flight"""
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def slow_load(symbol):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            return load(symbol)
+
+        def sink(symbol, res):
+            with lock:
+                state["active"] -= 1
+
+        pipe = dml.Pipeline(max_workers=8, max_symbols=2)
+        pipe.add_stage("bars", slow_load, kind="io")
+        pipe.add_stage("total", lambda symbol, bars: sum(bars), depends=["bars"])
+        pipe.run(self.symbols, sink=sink)
+        eq_(state["peak"], 2)
+
+    def test_failed_symbol(self):
+        """Test a failing symbol is reported without stopping the others"""
+
+        def fragile(symbol, bars):
+            if symbol == "CL":
+                raise ValueError("bad data")
+            return sum(bars)
+
+        results = {}
+        pipe = dml.Pipeline(max_workers=2)
+        pipe.add_stage("bars", load, kind="io")
+        pipe.add_stage("total", fragile, depends=["bars"])
+        failed = pipe.run(
+            self.symbols, sink=lambda symbol, res: results.update({symbol: res})
+        )
+        eq_(list(failed), ["CL"])
+        eq_(len(results), len(self.symbols) - 1)
+
+    def test_failed_symbol_waits_for_stages(self):
+        """Test a failed symbol keeps its slot until its running stages finish"""
+        events = []
+
+        def slow(symbol, bars):
+            time.sleep(0.3)
+            events.append(("slow done", symbol))
+
+        def broken(symbol, bars):
+            raise ValueError("bad data")
+
+        def tracked_load(symbol):
+            events.append(("load", symbol))
+            return load(symbol)
+
+        pipe = dml.Pipeline(max_workers=4, max_symbols=1)
+        pipe.add_stage("bars", tracked_load, kind="io")
+        pipe.add_stage("slow", slow, depends=["bars"])
+        pipe.add_stage("broken", broken, depends=["bars"])
+        failed = pipe.run(["ES", "NQ"], sink=discard)
+        eq_(sorted(failed), ["ES", "NQ"])
+        eq_(
+            events,
+            [("load", "ES"), ("slow done", "ES"), ("load", "NQ"), ("slow done", "NQ")],
+        )
+
+    def test_failed_symbol_data_released(self):
+        """Test failed symbols' data is not kept alive by the returned exceptions"""
+        refs = []
+
+        def tracked_load(symbol):
+            bars = Bars(load(symbol))
+            refs.append(weakref.ref(bars))
+            return bars
+
+        def broken(symbol, bars):
+            raise ValueError("bad data")
+
+        pipe = dml.Pipeline(max_workers=2, max_symbols=1)
+        pipe.add_stage("bars", tracked_load, kind="io")
+        pipe.add_stage("broken", broken, depends=["bars"])
+        # test runners keep logged records, whose exc_info holds the traceback
+        pipe_logger = logging.getLogger("decisiveml.pipeline")
+        pipe_logger.disabled = True
+        try:
+            failed = pipe.run(self.symbols[:5], sink=discard)
+        finally:
+            pipe_logger.disabled = False
+        gc.collect()
+        eq_(len(failed), 5)
+        eq_([ref() for ref in refs], [None] * 5)
+
+    def test_blocking_sink(self):
+        """Test a blocking sink does not serialize the other symbols"""
+
+        def slow_sink(symbol, results):
+            time.sleep(0.3)
+
+        pipe = dml.Pipeline(max_workers=4, max_symbols=4)
+        pipe.add_stage("bars", load, kind="io")
+        start = time.time()
+        pipe.run(self.symbols[:4], sink=slow_sink)
+        eq_(time.time() - start < 0.9, True)
+
+    def test_invalid_dag(self):
+        """Test unknown dependencies and cycles are rejected"""
+        pipe = dml.Pipeline()
+        pipe.add_stage("a", load, depends=["missing"])
+        with self.assertRaises(dml.PipelineError):
+            pipe.run(self.symbols, sink=discard)
+
+        pipe = dml.Pipeline()
+        pipe.add_stage("a", load, depends=["b"])
+        pipe.add_stage("b", load, depends=["a"])
+        with self.assertRaises(dml.PipelineError):
+            pipe.run(self.symbols, sink=discard)
+
+        with self.assertRaises(dml.PipelineError):
+            self.pipe.add_stage("bars", load)